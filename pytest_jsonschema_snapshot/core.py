@@ -2,8 +2,12 @@
 Core logic of the plugin.
 """
 
-import json
+import copy
 import logging
+import os
+import re
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Callable, Optional, Set
 
@@ -13,10 +17,66 @@ if TYPE_CHECKING:
     from jsonschema_diff import JsonSchemaDiff
 
 import pytest
-from jsonschema import FormatChecker, ValidationError, validate
+from jsonschema import FormatChecker, ValidationError
+from jsonschema.exceptions import best_match
+from jsonschema.protocols import Validator
+from jsonschema.validators import validator_for
 
 from .stats import GLOBAL_STATS
-from .tools import JsonToSchemaConverter, NameMaker
+from .tools import JsonToSchemaConverter, NameMaker, json_io
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    # добавляем вывод в stderr (один раз на модуль, а не на каждый SchemaShot)
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(_handler)
+    # и поднимаем уровень, чтобы INFO/DEBUG прошли через handler
+    logger.setLevel(logging.INFO)
+
+# FormatChecker() copies the global checker registry, so build it only once
+_FORMAT_CHECKER = FormatChecker()
+
+# (format_mode, ordered fingerprint of data) -> (schema built from that data, its
+# fingerprint); LRU-evicted
+_SCHEMA_BUILD_CACHE: "OrderedDict[tuple[str, bytes], tuple[dict, bytes]]" = OrderedDict()
+_SCHEMA_BUILD_CACHE_SIZE = 512
+_DIFF_CACHE_SIZE = 256
+
+
+# Имена из этого алфавита допустимы на любой ОС, кроме зарезервированных в Windows
+_SAFE_NAME_RE = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9._-]{0,254}")
+_WIN_RESERVED_NAMES = frozenset(
+    ["CON", "PRN", "AUX", "NUL", "CLOCK$"]
+    + [f"{prefix}{i}" for prefix in ("COM", "LPT") for i in range(10)]
+)
+
+
+@lru_cache(maxsize=1024)
+def _validate_name(name: str) -> str:
+    """
+    Checks that the name is a valid file name. Valid names are cached,
+    invalid ones raise every time.
+
+    Plain ASCII names are accepted by a regex; anything else goes through
+    `pathvalidate`.
+
+    Raises:
+        ValueError
+    """
+    if (
+        _SAFE_NAME_RE.fullmatch(name)
+        and not name.endswith(".")
+        and name.split(".", 1)[0].upper() not in _WIN_RESERVED_NAMES
+    ):
+        return name
+
+    try:
+        # auto подберёт правила под текущую ОС
+        pathvalidate.validate_filename(name, platform="auto")  # allow_reserved=False по умолчанию
+    except pathvalidate.ValidationError as e:
+        raise ValueError(f"Invalid schema name: {e}") from None
+    return name
 
 
 class SchemaShot:
@@ -53,18 +113,29 @@ class SchemaShot:
         self.debug_mode: bool = debug_mode
         self.snapshot_dir: Path = root_dir / snapshot_dir_name
         self.used_schemas: Set[str] = set()
-
-        self.logger = logging.getLogger(__name__)
-        # добавляем вывод в stderr
-        handler = logging.StreamHandler()
-        handler.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
-        self.logger.addHandler(handler)
-        # и поднимаем уровень, чтобы INFO/DEBUG прошли через handler
-        self.logger.setLevel(logging.INFO)
+        # schema file name -> (exists, parsed schema); filled on first access
+        self._schema_cache: dict[str, tuple[bool, Optional[dict]]] = {}
+        # schema file name -> fingerprint of the stored schema; computed lazily
+        self._schema_hash_cache: dict[str, bytes] = {}
+        # schema fingerprint -> ready-to-use validator
+        self._validator_cache: dict[bytes, Validator] = {}
+        # (old fingerprint, new fingerprint) -> rendered diff; LRU-evicted
+        self._diff_cache: "OrderedDict[tuple[bytes, bytes], str]" = OrderedDict()
+        # schema name -> path of its `.schema.json` file
+        self._path_cache: dict[str, Path] = {}
+        # names of `*.json` files (schemas and originals) in snapshot_dir;
+        # scanned once on first use
+        self._dir_index: Optional[Set[str]] = None
+        # names missing from the index that were also checked on disk; other
+        # processes (e.g. pytest-xdist workers) may create files after the scan
+        self._confirmed_missing: Set[str] = set()
+
+        self.logger = logger
 
         # Создаем директорию для снэпшотов, если её нет
         if not self.snapshot_dir.exists():
             self.snapshot_dir.mkdir(parents=True)
+            self._dir_index = set()  # директория только что создана – она пуста
 
     def _process_name(self, name: str | int | Callable | list[str | int | Callable]) -> str:
         """
@@ -93,29 +164,170 @@ class SchemaShot:
         if not isinstance(name, str) or not name:
             raise ValueError("Schema name must be a non-empty string")
 
-        try:
-            # auto подберёт правила под текущую ОС
-            pathvalidate.validate_filename(
-                name, platform="auto"
-            )  # allow_reserved=False по умолчанию
-        except ValidationError as e:
-            raise ValueError(f"Invalid schema name: {e}") from None
+        return _validate_name(name)
 
-        return name
+    def _scan_snapshot_dir(self) -> Set[str]:
+        """
+        Returns names of the JSON files (schemas and originals) in the snapshot
+        directory. The directory is read with a single `os.scandir` on the first call.
+        """
+        if self._dir_index is None:
+            try:
+                with os.scandir(self.snapshot_dir) as it:
+                    self._dir_index = {
+                        entry.name
+                        for entry in it
+                        if entry.name.endswith(".json") and entry.is_file()
+                    }
+            except FileNotFoundError:
+                self._dir_index = set()
+        return self._dir_index
+
+    def snapshot_files(self) -> frozenset[str]:
+        """Returns names of the JSON files (schemas and originals) in the snapshot directory."""
+        return frozenset(self._scan_snapshot_dir())
+
+    def file_exists(self, file_name: str) -> bool:
+        """
+        Tells whether a file exists in the snapshot directory. A name that is
+        not in the index is checked on disk once before it is treated as absent.
+        """
+        index = self._scan_snapshot_dir()
+        if file_name in index:
+            return True
+        if file_name in self._confirmed_missing:
+            return False
+        if (self.snapshot_dir / file_name).is_file():
+            index.add(file_name)  # создан другим процессом после сканирования
+            return True
+        self._confirmed_missing.add(file_name)
+        return False
+
+    def _schema_path(self, name: str) -> Path:
+        """Returns the path of the schema file for an already processed name."""
+        schema_path = self._path_cache.get(name)
+        if schema_path is None:
+            schema_path = self._path_cache[name] = self.snapshot_dir / f"{name}.schema.json"
+        return schema_path
+
+    def _load_schema(self, schema_path: Path) -> tuple[bool, Optional[dict]]:
+        """
+        Returns `(exists, schema)` for the schema file.
+        The disk is touched only on the first access to each name.
+        """
+        cached = self._schema_cache.get(schema_path.name)
+        if cached is not None:
+            return cached
+
+        entry: tuple[bool, Optional[dict]] = (False, None)
+        if self.file_exists(schema_path.name):
+            try:
+                with open(schema_path, "rb") as f:
+                    entry = (True, json_io.loads(f.read()))
+            except FileNotFoundError:
+                pass  # файл удалён после сканирования директории
+
+        self._schema_cache[schema_path.name] = entry
+        return entry
+
+    def _write_schema(
+        self, schema_path: Path, schema: dict, fingerprint: Optional[bytes] = None
+    ) -> None:
+        """
+        Writes the schema to disk and keeps the cache in sync.
+        An already known fingerprint of the schema is kept for later comparisons.
+        """
+        data = json_io.write_file(schema_path, schema)
+        # кэшируем собственную копию того, что лежит на диске: вызывающий код
+        # (например, assert_schema_match) может потом изменить свой dict
+        self._schema_cache[schema_path.name] = (True, json_io.loads(data))
+        if fingerprint is None:
+            self._schema_hash_cache.pop(schema_path.name, None)
+        else:
+            self._schema_hash_cache[schema_path.name] = fingerprint
+        self._scan_snapshot_dir().add(schema_path.name)
+        self._confirmed_missing.discard(schema_path.name)
+
+    def forget_file(self, file_name: str) -> None:
+        """Drops the cached state of a snapshot file (e.g. after it was deleted)."""
+        self._schema_cache.pop(file_name, None)
+        self._schema_hash_cache.pop(file_name, None)
+        if self._dir_index is not None:
+            self._dir_index.discard(file_name)
+        self._confirmed_missing.discard(file_name)
+
+    def _is_same_schema(self, schema_name: str, existing: dict, current_fingerprint: bytes) -> bool:
+        """
+        Compares the stored schema with the current one by their fingerprints
+        (sorted-key serializations), instead of a recursive dict comparison.
+        Unlike `==`, this also tells apart ``1``/``1.0``/``true``, which are
+        different values in JSON Schema (e.g. in ``const`` or ``enum``).
+        """
+        return self._fingerprint(schema_name, existing) == current_fingerprint
+
+    def _fingerprint(self, schema_name: str, schema: dict) -> bytes:
+        """Returns the cached fingerprint of the stored schema."""
+        known = self._schema_hash_cache.get(schema_name)
+        if known is None:
+            known = self._schema_hash_cache[schema_name] = json_io.fingerprint(schema)
+        return known
+
+    def _render_diff(
+        self, schema_name: str, old: dict, new: dict, new_fingerprint: Optional[bytes] = None
+    ) -> str:
+        """
+        Renders the diff between the stored schema and a new one.
+        The same pair of schemas is rendered only once.
+        """
+        if new_fingerprint is None:
+            new_fingerprint = json_io.fingerprint(new)
+        key = (self._fingerprint(schema_name, old), new_fingerprint)
+        diff = self._diff_cache.get(key)
+        if diff is None:
+            # compare() схемы только читает – защитная копия не нужна
+            diff = self._diff_cache[key] = self.differ.compare(old, new).render()
+            if len(self._diff_cache) > _DIFF_CACHE_SIZE:
+                self._diff_cache.popitem(last=False)
+        else:
+            self._diff_cache.move_to_end(key)
+        return diff
+
+    def _validate(self, schema_name: str, schema: dict, data: Any) -> None:
+        """
+        Same as `jsonschema.validate`, but the validator (and the check of
+        the schema itself) is built once per distinct schema.
+
+        Raises:
+            ValidationError
+        """
+        digest = self._fingerprint(schema_name, schema)
+        validator = self._validator_cache.get(digest)
+        if validator is None:
+            cls = validator_for(schema)
+            cls.check_schema(schema)
+            validator = cls(schema, format_checker=_FORMAT_CHECKER)
+            self._validator_cache[digest] = validator
+
+        error = best_match(validator.iter_errors(data))
+        if error is not None:
+            raise error
 
     def _save_process_original(self, real_name: str, status: Optional[bool], data: dict) -> None:
         json_name = f"{real_name}.json"
         json_path = self.snapshot_dir / json_name
 
+        json_exists = self.file_exists(json_name)
+
         if self.save_original:
-            available_to_create = not json_path.exists() or status is None
+            available_to_create = not json_exists or status is None
             available_to_update = status is True
 
             if (available_to_create and self.update_actions.get("add")) or (
                 available_to_update and self.update_actions.get("update")
             ):
-                with open(json_path, "w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
+                json_io.write_file(json_path, data)
+                self._scan_snapshot_dir().add(json_name)
+                self._confirmed_missing.discard(json_name)
 
                 if available_to_create:
                     GLOBAL_STATS.add_created(json_name)
@@ -123,11 +335,58 @@ class SchemaShot:
                     GLOBAL_STATS.add_updated(json_name)
                 else:
                     raise ValueError(f"Unexpected status: {status}")
-        elif json_path.exists() and self.update_actions.get("delete"):
+        elif json_exists and self.update_actions.get("delete"):
             # удаляем
-            json_path.unlink()
+            json_path.unlink(missing_ok=True)
+            self.forget_file(json_name)
             GLOBAL_STATS.add_deleted(json_name)
 
+    def _build_schema(self, data: Any) -> dict:
+        """
+        Builds a schema from the data. Identical data (e.g. in parametrized
+        tests or loops) reuses the previously built schema.
+        """
+        return self._build_schema_with_fingerprint(data)[0]
+
+    def _build_schema_with_fingerprint(self, data: Any) -> tuple[dict, Optional[bytes]]:
+        """
+        Same as `_build_schema`, but also returns the fingerprint of the
+        schema (None if the schema can't be serialized). For cached data the
+        fingerprint is not recomputed.
+        """
+        key = None
+        if json_io.is_plain(data):
+            try:
+                # порядок ключей важен: от него зависит порядок properties в схеме
+                key = (self.format_mode, json_io.ordered_fingerprint(data))
+            except (TypeError, ValueError):
+                pass  # например, одиночный суррогат в строке – строим без кэша
+
+        if key is not None and key in _SCHEMA_BUILD_CACHE:
+            _SCHEMA_BUILD_CACHE.move_to_end(key)
+            cached_schema, fingerprint = _SCHEMA_BUILD_CACHE[key]
+            return copy.deepcopy(cached_schema), fingerprint
+
+        builder = JsonToSchemaConverter(
+            format_mode=self.format_mode  # type: ignore[arg-type]
+        )  # , examples=self.examples_limit)
+        builder.add_object(data)
+        schema = builder.to_schema()
+
+        if key is None:
+            # данные без однозначного ключа (NaN, datetime, не-str ключи) не кэшируем
+            try:
+                return schema, json_io.fingerprint(schema)
+            except (TypeError, ValueError):
+                return schema, None
+
+        # отпечаток всё равно понадобится для сравнения или записи схемы
+        fingerprint = json_io.fingerprint(schema)
+        _SCHEMA_BUILD_CACHE[key] = (copy.deepcopy(schema), fingerprint)
+        if len(_SCHEMA_BUILD_CACHE) > _SCHEMA_BUILD_CACHE_SIZE:
+            _SCHEMA_BUILD_CACHE.popitem(last=False)
+        return schema, fingerprint
+
     def assert_json_match(
         self,
         data: dict,
@@ -144,13 +403,9 @@ class SchemaShot:
 
         real_name = self._process_name(name)
 
-        builder = JsonToSchemaConverter(
-            format_mode=self.format_mode  # type: ignore[arg-type]
-        )  # , examples=self.examples_limit)
-        builder.add_object(data)
-        current_schema = builder.to_schema()
+        current_schema, current_fp = self._build_schema_with_fingerprint(data)
 
-        real_name, status = self._base_match(data, current_schema, real_name)
+        real_name, status = self._base_match(data, current_schema, real_name, current_fp)
 
         if self.update_mode or self.reset_mode:
             self._save_process_original(real_name=real_name, status=status, data=data)
@@ -187,10 +442,13 @@ class SchemaShot:
         data: Optional[dict],
         current_schema: dict,
         name: str,
+        current_fp: Optional[bytes] = None,
     ) -> tuple[str, Optional[bool]]:
         """
         Checks if data matches the JSON schema, creates/updates it if needed,
         and writes statistics to GLOBAL_STATS.
+        `name` must already be processed by `_process_name`; `current_fp` is
+        the fingerprint of `current_schema`, if the caller already has it.
 
         Returns:
             True  – the schema has been updated,
@@ -199,14 +457,11 @@ class SchemaShot:
         """
         __tracebackhide__ = not self.debug_mode  # прячем из стека pytest
 
-        # Проверка имени
-        name = self._process_name(name)
-
-        schema_path = self.snapshot_dir / f"{name}.schema.json"
+        schema_path = self._schema_path(name)
         self.used_schemas.add(schema_path.name)
 
         # --- состояние ДО проверки ---
-        schema_exists_before = schema_path.exists()
+        schema_exists_before, existing_schema = self._load_schema(schema_path)
 
         # --- когда схемы ещё нет ---
         if not schema_exists_before:
@@ -220,30 +475,31 @@ class SchemaShot:
                     f"Schema `{name}` not found and adding new schemas is disabled."
                 )
 
-            with open(schema_path, "w", encoding="utf-8") as f:
-                json.dump(current_schema, f, indent=2, ensure_ascii=False)
+            self._write_schema(schema_path, current_schema, current_fp)
 
             self.logger.info(f"New schema `{name}` has been created.")
             GLOBAL_STATS.add_created(schema_path.name)  # статистика «создана»
             return name, None
         else:
-            with open(schema_path, "r", encoding="utf-8") as f:
-                existing_schema = json.load(f)
+            assert existing_schema is not None
 
             # --- схема уже была: сравнение и валидация --------------------------------
             schema_updated = False
 
-            if existing_schema != current_schema:  # есть отличия
+            # отпечаток текущей схемы нужен и для сравнения, и для diff, и для записи
+            if current_fp is None:
+                current_fp = json_io.fingerprint(current_schema)
+
+            if not self._is_same_schema(schema_path.name, existing_schema, current_fp):
                 if (self.update_mode or self.reset_mode) and self.update_actions.get("update"):
                     # обновляем файл
                     if self.reset_mode and not self.update_mode:
-                        differences = self.differ.compare(
-                            dict(existing_schema), current_schema
-                        ).render()
+                        differences = self._render_diff(
+                            schema_path.name, existing_schema, current_schema, current_fp
+                        )
                         GLOBAL_STATS.add_updated(schema_path.name, differences)
 
-                        with open(schema_path, "w", encoding="utf-8") as f:
-                            json.dump(current_schema, f, indent=2, ensure_ascii=False)
+                        self._write_schema(schema_path, current_schema, current_fp)
                         self.logger.warning(f"Schema `{name}` updated (reset).\n\n{differences}")
                     elif self.update_mode and not self.reset_mode:
                         builder = JsonToSchemaConverter(
@@ -253,13 +509,13 @@ class SchemaShot:
                         builder.add_schema(current_schema)
                         merged_schema = builder.to_schema()
 
-                        differences = self.differ.compare(
-                            dict(existing_schema), merged_schema
-                        ).render()
+                        merged_fp = json_io.fingerprint(merged_schema)
+                        differences = self._render_diff(
+                            schema_path.name, existing_schema, merged_schema, merged_fp
+                        )
                         GLOBAL_STATS.add_updated(schema_path.name, differences)
 
-                        with open(schema_path, "w", encoding="utf-8") as f:
-                            json.dump(merged_schema, f, indent=2, ensure_ascii=False)
+                        self._write_schema(schema_path, merged_schema, merged_fp)
 
                         self.logger.warning(f"Schema `{name}` updated (update).\n\n{differences}")
                     else:  # both update_mode and reset_mode are True
@@ -268,18 +524,15 @@ class SchemaShot:
                         )
                     schema_updated = True
                 elif data is not None:
-                    differences = self.differ.compare(
-                        dict(existing_schema), current_schema
-                    ).render()
+                    # рендерим сразу: вызывающий код может изменить current_schema позже
+                    differences = self._render_diff(
+                        schema_path.name, existing_schema, current_schema, current_fp
+                    )
                     GLOBAL_STATS.add_uncommitted(schema_path.name, differences)
 
                     # только валидируем по старой схеме
                     try:
-                        validate(
-                            instance=data,
-                            schema=existing_schema,
-                            format_checker=FormatChecker(),
-                        )
+                        self._validate(schema_path.name, existing_schema, data)
                     except ValidationError as e:
                         pytest.fail(
                             f"\n\n{differences}\n\nValidation error in `{name}`: {e.message}"
@@ -287,15 +540,9 @@ class SchemaShot:
             elif data is not None:
                 # схемы совпали – всё равно валидируем на случай формальных ошибок
                 try:
-                    validate(
-                        instance=data,
-                        schema=existing_schema,
-                        format_checker=FormatChecker(),
-                    )
+                    self._validate(schema_path.name, existing_schema, data)
                 except ValidationError as e:
-                    differences = self.differ.compare(
-                        dict(existing_schema), current_schema
-                    ).render()
-                    pytest.fail(f"\n\n{differences}\n\nValidation error in `{name}`: {e.message}")
+                    # схемы равны, значит diff пуст – рендерить его незачем
+                    pytest.fail(f"\n\nValidation error in `{name}`: {e.message}")
 
             return name, schema_updated
@@ -1,21 +1,23 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Dict, Generator, Optional
+from typing import TYPE_CHECKING, Any, Dict, Generator, Optional
 
 import pytest
-from jsonschema_diff import ConfigMaker, JsonSchemaDiff
-from jsonschema_diff.color import HighlighterPipeline
-from jsonschema_diff.color.stages import (
-    MonoLinesHighlighter,
-    PathHighlighter,
-    ReplaceGenericHighlighter,
-)
 
 from .core import SchemaShot
 from .stats import GLOBAL_STATS, SchemaStats
 
+if TYPE_CHECKING:
+    from jsonschema_diff import JsonSchemaDiff
+
 # Global storage of SchemaShot instances for different directories
 _schema_managers: Dict[Path, SchemaShot] = {}
 
+# Starting from this many stale schemas they are deleted by a thread pool
+_PARALLEL_DELETE_THRESHOLD = 16
+_PARALLEL_DELETE_WORKERS = 8
+
 
 def pytest_addoption(parser: pytest.Parser) -> None:
     """Adds --schema-update option to pytest."""
@@ -77,6 +79,76 @@ def pytest_addoption(parser: pytest.Parser) -> None:
     )
 
 
+_SETTINGS_KEY = pytest.StashKey[Dict[str, Any]]()
+
+
+def _get_settings(config: pytest.Config) -> Dict[str, Any]:
+    """
+    Reads plugin options and ini values once per session.
+
+    Returns:
+        keyword arguments for SchemaShot (everything except root_dir and differ)
+    Raises:
+        ValueError
+    """
+    settings = config.stash.get(_SETTINGS_KEY, None)
+    if settings is not None:
+        return settings
+
+    update_mode = bool(config.getoption("--schema-update"))
+    reset_mode = bool(config.getoption("--schema-reset"))
+    if update_mode and reset_mode:
+        raise ValueError("Options --schema-update and --schema-reset are mutually exclusive.")
+
+    settings = {
+        "update_mode": update_mode,
+        "reset_mode": reset_mode,
+        "save_original": bool(config.getoption("--save-original")),
+        "debug_mode": bool(config.getoption("--jsss-debug")),
+        "update_actions": {
+            "delete": not config.getoption("--without-delete"),
+            "update": not config.getoption("--without-update"),
+            "add": not config.getoption("--without-add"),
+        },
+        # Получаем настраиваемую директорию для схем
+        "snapshot_dir_name": str(config.getini("jsss_dir")),
+        "callable_regex": str(config.getini("jsss_callable_regex")),
+        "format_mode": str(config.getini("jsss_format_mode")).lower(),
+        # "examples_limit": int(config.getini("jsss_examples_limit")),
+    }
+    config.stash[_SETTINGS_KEY] = settings
+    return settings
+
+
+_DIFFER_KEY = pytest.StashKey["JsonSchemaDiff"]()
+
+
+def _get_differ(config: pytest.Config) -> "JsonSchemaDiff":
+    """
+    Returns the differ shared by all snapshot directories of the session.
+    It is built (and jsonschema_diff imported) on first use, so sessions
+    that never request `schemashot` don't pay for it.
+    """
+    differ = config.stash.get(_DIFFER_KEY, None)
+    if differ is None:
+        from jsonschema_diff import ConfigMaker, JsonSchemaDiff
+        from jsonschema_diff.color import HighlighterPipeline
+        from jsonschema_diff.color.stages import (
+            MonoLinesHighlighter,
+            PathHighlighter,
+            ReplaceGenericHighlighter,
+        )
+
+        differ = JsonSchemaDiff(
+            ConfigMaker.make(),
+            HighlighterPipeline(
+                [MonoLinesHighlighter(), PathHighlighter(), ReplaceGenericHighlighter()]
+            ),
+        )
+        config.stash[_DIFFER_KEY] = differ
+    return differ
+
+
 @pytest.fixture(scope="function")
 def schemashot(request: pytest.FixtureRequest) -> Generator[SchemaShot, None, None]:
     """
@@ -87,51 +159,16 @@ def schemashot(request: pytest.FixtureRequest) -> Generator[SchemaShot, None, No
     test_path = Path(request.node.path if hasattr(request.node, "path") else request.node.fspath)
     root_dir = test_path.parent
 
-    update_mode = bool(request.config.getoption("--schema-update"))
-    reset_mode = bool(request.config.getoption("--schema-reset"))
-    if update_mode and reset_mode:
-        raise ValueError("Options --schema-update and --schema-reset are mutually exclusive.")
-
-    save_original = bool(request.config.getoption("--save-original"))
-    debug_mode = bool(request.config.getoption("--jsss-debug"))
-
-    actions = {
-        "delete": not request.config.getoption("--without-delete"),
-        "update": not request.config.getoption("--without-update"),
-        "add": not request.config.getoption("--without-add"),
-    }
-
-    # Получаем настраиваемую директорию для схем
-    schema_dir_name = str(request.config.getini("jsss_dir"))
-    callable_regex = str(request.config.getini("jsss_callable_regex"))
-    format_mode = str(request.config.getini("jsss_format_mode")).lower()
-    # examples_limit = int(request.config.getini("jsss_examples_limit"))
-
-    differ = JsonSchemaDiff(
-        ConfigMaker.make(),
-        HighlighterPipeline(
-            [MonoLinesHighlighter(), PathHighlighter(), ReplaceGenericHighlighter()]
-        ),
-    )
+    settings = _get_settings(request.config)
 
     # Создаем или получаем экземпляр SchemaShot для этой директории
-    if root_dir not in _schema_managers:
-        _schema_managers[root_dir] = SchemaShot(
-            root_dir,
-            differ,
-            callable_regex,
-            format_mode,
-            # examples_limit,
-            update_mode,
-            reset_mode,
-            actions,
-            save_original,
-            debug_mode,
-            schema_dir_name,
+    manager = _schema_managers.get(root_dir)
+    if manager is None:
+        manager = _schema_managers[root_dir] = SchemaShot(
+            root_dir, _get_differ(request.config), **settings
         )
 
-    # Создаем локальный экземпляр для теста
-    yield _schema_managers[root_dir]
+    yield manager
 
 
 @pytest.hookimpl(trylast=True)
@@ -185,56 +222,82 @@ def cleanup_unused_schemas(
     """
     Deletes unused schemas in update mode and collects statistics.
     Additionally, deletes the pair file `<name>.json` if it exists.
+    Many stale files are deleted in parallel threads.
 
     Args:
         manager: SchemaShot instance
         update_mode: Update mode
         stats: Optional object for collecting statistics
     """
-    # Если директория снимков не существует, ничего не делаем
-    if not manager.snapshot_dir.exists():
+    # Индекс директории собран через os.scandir (пустой, если директории нет).
+    # Если все схемы использованы, удалять и собирать нечего.
+    all_schemas = {n for n in manager.snapshot_files() if n.endswith(".schema.json")}
+    unused = sorted(all_schemas - manager.used_schemas)
+    if not unused:
         return
 
-    # Перебираем все файлы схем
-    all_schemas = list(manager.snapshot_dir.glob("*.schema.json"))
-
-    for schema_file in all_schemas:
-        if schema_file.name not in manager.used_schemas:
-            if update_mode and actions.get("delete"):
-                try:
-                    # Удаляем саму схему
-                    schema_file.unlink()
-                    if stats:
-                        stats.add_deleted(schema_file.name)
-
-                    # Пытаемся удалить парный JSON: <name>.json
-                    # Преобразуем "<name>.schema.json" -> "<name>.json"
-                    base_name = schema_file.name[: -len(".schema.json")]
-                    paired_json = schema_file.with_name(f"{base_name}.json")
-                    if paired_json.exists():
-                        try:
-                            paired_json.unlink()
-                            if stats:
-                                stats.add_deleted(paired_json.name)
-                        except OSError as e:
-                            manager.logger.warning(
-                                f"Failed to delete paired JSON for {schema_file.name}: {e}"
-                            )
-                        except Exception as e:
-                            manager.logger.error(
-                                f"Unexpected error deleting paired JSON for {schema_file.name}: {e}"
-                            )
-
-                except OSError as e:
-                    # Логируем ошибки удаления, но не прерываем работу
-                    manager.logger.warning(
-                        f"Failed to delete unused schema {schema_file.name}: {e}"
-                    )
-                except Exception as e:
-                    # Неожиданные ошибки тоже логируем
-                    manager.logger.error(
-                        f"Unexpected error deleting schema {schema_file.name}: {e}"
-                    )
-            else:
-                if stats:
-                    stats.add_unused(schema_file.name)
+    if not (update_mode and actions.get("delete")):
+        if stats:
+            for name in unused:
+                stats.add_unused(name)
+        return
+
+    # парные <name>.json ищем до запуска потоков: кэш файлов трогаем только отсюда
+    paired: list[Optional[str]] = []
+    for name in unused:
+        paired_name = f"{name[: -len('.schema.json')]}.json"
+        paired.append(paired_name if manager.file_exists(paired_name) else None)
+
+    delete = partial(_delete_unused_schema, manager)
+    if len(unused) >= _PARALLEL_DELETE_THRESHOLD:
+        # unlink отпускает GIL – на сетевых ФС параллельное удаление заметно быстрее
+        with ThreadPoolExecutor(max_workers=_PARALLEL_DELETE_WORKERS) as pool:
+            results = list(pool.map(delete, unused, paired))
+    else:
+        results = [delete(name, paired_name) for name, paired_name in zip(unused, paired)]
+
+    # кэш и статистику обновляем в основном потоке, в исходном порядке
+    for deleted_names in results:
+        for name in deleted_names:
+            manager.forget_file(name)
+            if stats:
+                stats.add_deleted(name)
+
+
+def _delete_unused_schema(
+    manager: SchemaShot, schema_name: str, paired_name: Optional[str]
+) -> list[str]:
+    """
+    Deletes the schema file and its paired `<name>.json` (*paired_name*,
+    None if there is none). Runs in worker threads, so it only touches
+    the disk, not the caches of *manager*. Errors are logged, not raised.
+
+    Returns:
+        names of the files that were actually deleted
+    """
+    schema_file = manager.snapshot_dir / schema_name
+    deleted: list[str] = []
+    try:
+        # Удаляем саму схему
+        schema_file.unlink()
+        deleted.append(schema_name)
+
+        # Пытаемся удалить парный JSON: <name>.json
+        if paired_name is not None:
+            try:
+                (manager.snapshot_dir / paired_name).unlink()
+                deleted.append(paired_name)
+            except OSError as e:
+                manager.logger.warning(f"Failed to delete paired JSON for {schema_name}: {e}")
+            except Exception as e:
+                manager.logger.error(
+                    f"Unexpected error deleting paired JSON for {schema_name}: {e}"
+                )
+
+    except OSError as e:
+        # Логируем ошибки удаления, но не прерываем работу
+        manager.logger.warning(f"Failed to delete unused schema {schema_name}: {e}")
+    except Exception as e:
+        # Неожиданные ошибки тоже логируем
+        manager.logger.error(f"Unexpected error deleting schema {schema_name}: {e}")
+    return deleted
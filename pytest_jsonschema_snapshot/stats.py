@@ -2,14 +2,78 @@
 Module for collecting and displaying statistics about schemas.
 """
 
-from typing import Dict, Generator, List, Optional
+import sys
+from typing import Dict, Iterator, List, Optional, Set
 
 import pytest
 
+_SCHEMA_SFX = ".schema.json"
+_JSON_SFX = ".json"
+
+
+class _MergedView:
+    """
+    Display rows of one summary section, maintained while names are added.
+
+    Each row is (display, schema_key):
+    - display: string to display (may have " + original")
+    - schema_key: file name of the schema (<name>.schema.json) to find diffs,
+        or None if it's not a schema.
+    Merging happens at the .schema.json position; a .json whose schema is
+    present is hidden, single .json rows are left as is.
+    """
+
+    __slots__ = ("_rows", "_schema_rows", "_original_rows")
+
+    def __init__(self) -> None:
+        self._rows: List[List] = []  # [display, schema_key, visible]
+        self._schema_rows: Dict[str, int] = {}  # base -> row index
+        self._original_rows: Dict[str, int] = {}  # base -> row index
+
+    def add(self, name: str) -> None:
+        if name.endswith(_SCHEMA_SFX):
+            base = name[: -len(_SCHEMA_SFX)]
+            display = name
+            if base in self._original_rows:
+                # оригинал уже выведен отдельно – прячем его и сливаем со схемой
+                self._rows[self._original_rows[base]][2] = False
+                display = f"{name} + original"
+            self._schema_rows[base] = len(self._rows)
+            self._rows.append([display, name, True])
+        elif name.endswith(_JSON_SFX):
+            base = name[: -len(_JSON_SFX)]
+            self._original_rows[base] = len(self._rows)
+            if base in self._schema_rows:
+                row = self._rows[self._schema_rows[base]]
+                row[0] = f"{row[1]} + original"
+                self._rows.append([name, None, False])
+            else:
+                self._rows.append([name, None, True])
+        else:
+            # на всякий случай — прочие имена
+            self._rows.append([name, name, True])
+
+    def __iter__(self) -> Iterator[tuple[str, Optional[str]]]:
+        for display, key, visible in self._rows:
+            if visible:
+                yield display, key
+
 
 class SchemaStats:
     """Class for collecting and displaying statistics about schemas"""
 
+    __slots__ = (
+        "created",
+        "updated",
+        "updated_diffs",
+        "uncommitted",
+        "uncommitted_diffs",
+        "deleted",
+        "unused",
+        "_seen",
+        "_merged",
+    )
+
     def __init__(self) -> None:
         self.created: List[str] = []
         self.updated: List[str] = []
@@ -18,35 +82,52 @@ class SchemaStats:
         self.uncommitted_diffs: Dict[str, str] = {}  # schema_name -> diff
         self.deleted: List[str] = []
         self.unused: List[str] = []
+        # bucket name -> names already in it (the lists above keep the order)
+        self._seen: Dict[str, Set[str]] = {}
+        # bucket name -> display rows for print_summary, merged as names arrive
+        self._merged: Dict[str, _MergedView] = {
+            bucket: _MergedView()
+            for bucket in ("created", "updated", "uncommitted", "deleted", "unused")
+        }
+
+    def _append_unique(self, bucket: str, schema_name: str) -> None:
+        """Appends the name to the bucket list unless it is already there"""
+        seen = self._seen.setdefault(bucket, set())
+        if schema_name not in seen:
+            seen.add(schema_name)
+            getattr(self, bucket).append(schema_name)
+            self._merged[bucket].add(schema_name)
 
     def add_created(self, schema_name: str) -> None:
         """Adds created schema"""
-        self.created.append(schema_name)
+        schema_name = sys.intern(schema_name)  # names are compared and hashed a lot
+        self._append_unique("created", schema_name)
 
     def add_updated(self, schema_name: str, diff: Optional[str] = None) -> None:
         """Adds updated schema"""
-        # Generate diff if both schemas are provided
+        schema_name = sys.intern(schema_name)
+        # If diff is not provided, assume it was an update anyway
+        self._append_unique("updated", schema_name)
         if diff and diff.strip():
-            self.updated.append(schema_name)
             self.updated_diffs[schema_name] = diff
-        else:
-            # If schemas are not provided, assume it was an update
-            self.updated.append(schema_name)
 
     def add_uncommitted(self, schema_name: str, diff: Optional[str] = None) -> None:
         """Adds schema with uncommitted changes"""
+        schema_name = sys.intern(schema_name)
         # Add only if there are real changes
         if diff and diff.strip():
-            self.uncommitted.append(schema_name)
+            self._append_unique("uncommitted", schema_name)
             self.uncommitted_diffs[schema_name] = diff
 
     def add_deleted(self, schema_name: str) -> None:
         """Adds deleted schema"""
-        self.deleted.append(schema_name)
+        schema_name = sys.intern(schema_name)
+        self._append_unique("deleted", schema_name)
 
     def add_unused(self, schema_name: str) -> None:
         """Adds unused schema"""
-        self.unused.append(schema_name)
+        schema_name = sys.intern(schema_name)
+        self._append_unique("unused", schema_name)
 
     def has_changes(self) -> bool:
         """Returns True if any schema has changes"""
@@ -86,45 +167,6 @@ class SchemaStats:
         Pairs of "<name>.schema.json" + "<name>.json" are merged into one line:
         "<name>.schema.json + original" (if original is present).
         """
-
-        def _iter_merged(names: List[str]) -> Generator[tuple[str, Optional[str]], None, None]:
-            """
-            Iterates over (display, schema_key):
-            - display: string to display (may have " + original")
-            - schema_key: file name of the schema (<name>.schema.json) to find diffs,
-                or None if it's not a schema.
-            Preserves the original list order: merging happens at .schema.json
-            position; single .json outputs are left as is.
-            """
-            names = list(names)  # порядок важен
-            schema_sfx = ".schema.json"
-            json_sfx = ".json"
-
-            # множество баз, где имеются схемы/оригиналы
-            bases_with_schema = {n[: -len(schema_sfx)] for n in names if n.endswith(schema_sfx)}
-            bases_with_original = {
-                n[: -len(json_sfx)]
-                for n in names
-                if n.endswith(json_sfx) and not n.endswith(schema_sfx)
-            }
-
-            for n in names:
-                if n.endswith(schema_sfx):
-                    base = n[: -len(schema_sfx)]
-                    if base in bases_with_original:
-                        yield f"{n} + original", n  # display, schema_key
-                    else:
-                        yield n, n
-                elif n.endswith(json_sfx) and not n.endswith(schema_sfx):
-                    base = n[: -len(json_sfx)]
-                    # если есть парная схема — .json не выводим отдельно
-                    if base in bases_with_schema:
-                        continue
-                    yield n, None
-                else:
-                    # на всякий случай — прочие имена
-                    yield n, n
-
         if not self.has_any_info():
             return
 
@@ -133,20 +175,18 @@ class SchemaStats:
         # Created
         if self.created:
             terminalreporter.write_line(f"Created schemas ({len(self.created)}):", green=True)
-            for display, _key in _iter_merged(self.created):
+            for display, _key in self._merged["created"]:
                 terminalreporter.write_line(f"  - {display}", green=True)
 
         # Updated
         if self.updated:
             terminalreporter.write_line(f"Updated schemas ({len(self.updated)}):", yellow=True)
-            for display, key in _iter_merged(self.updated):
+            for display, key in self._merged["updated"]:
                 terminalreporter.write_line(f"  - {display}", yellow=True)
                 # Показываем diff, если он есть под ключом схемы (.schema.json)
                 if key and key in self.updated_diffs:
                     terminalreporter.write_line("    Changes:", yellow=True)
-                    for line in self.updated_diffs[key].split("\n"):
-                        if line.strip():
-                            terminalreporter.write_line(f"      {line}")
+                    _write_diff(terminalreporter, self.updated_diffs[key])
                     terminalreporter.write_line("")  # разделение
                 elif key:
                     terminalreporter.write_line(
@@ -158,28 +198,33 @@ class SchemaStats:
             terminalreporter.write_line(
                 f"Uncommitted minor updates ({len(self.uncommitted)}):", bold=True
             )
-            for display, key in _iter_merged(self.uncommitted):
+            for display, key in self._merged["uncommitted"]:
                 terminalreporter.write_line(f"  - {display}", cyan=True)
                 if key and key in self.uncommitted_diffs:
                     terminalreporter.write_line("    Detected changes:", cyan=True)
-                    for line in self.uncommitted_diffs[key].split("\n"):
-                        if line.strip():
-                            terminalreporter.write_line(f"      {line}")
+                    _write_diff(terminalreporter, self.uncommitted_diffs[key])
                     terminalreporter.write_line("")  # разделение
             terminalreporter.write_line("Use --schema-update to commit these changes", cyan=True)
 
         # Deleted
         if self.deleted:
             terminalreporter.write_line(f"Deleted schemas ({len(self.deleted)}):", red=True)
-            for display, _key in _iter_merged(self.deleted):
+            for display, _key in self._merged["deleted"]:
                 terminalreporter.write_line(f"  - {display}", red=True)
 
         # Unused (только если не update_mode)
         if self.unused and not update_mode:
             terminalreporter.write_line(f"Unused schemas ({len(self.unused)}):")
-            for display, _key in _iter_merged(self.unused):
+            for display, _key in self._merged["unused"]:
                 terminalreporter.write_line(f"  - {display}")
             terminalreporter.write_line("Use --schema-update to delete unused schemas", yellow=True)
 
 
+def _write_diff(terminalreporter: pytest.TerminalReporter, diff: str) -> None:
+    """Writes the non-blank lines of *diff*, indented, with a single write_line call"""
+    lines = [f"      {line}" for line in diff.splitlines() if line.strip()]
+    if lines:
+        terminalreporter.write_line("\n".join(lines))
+
+
 GLOBAL_STATS = SchemaStats()
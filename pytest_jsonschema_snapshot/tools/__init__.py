@@ -1,4 +1,5 @@
+from . import json_io
 from .genson_addon import JsonToSchemaConverter
 from .name_maker import NameMaker
 
-__all__ = ["JsonToSchemaConverter", "NameMaker"]
+__all__ = ["JsonToSchemaConverter", "NameMaker", "json_io"]
@@ -1,25 +1,54 @@
 import re
+from functools import lru_cache
 from typing import Optional
 
+# Pattern sources in priority order: more specific formats first.
+# (group name, format name, regex source)
+_FORMATS = (
+    ("email", "email", r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"),
+    (
+        "uuid",
+        "uuid",
+        r"(?i:[0-9a-f]{8}-[0-9a-f]{4}-[1-5][0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12})",
+    ),
+    (
+        "date_time",
+        "date-time",
+        r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:\d{2})",
+    ),
+    ("date", "date", r"\d{4}-\d{2}-\d{2}"),
+    ("uri", "uri", r"(?i:https?://[^\s/$.?#].[^\s]*)"),
+    (
+        "ipv4",
+        "ipv4",
+        r"(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}"
+        r"(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)",
+    ),
+)
+_SOURCES = {group: source for group, _fmt, source in _FORMATS}
+
+# Longer strings (tokens, blobs) rarely repeat – don't let them fill the cache
+_CACHE_MAX_LEN = 256
+
 
 class FormatDetector:
     """Class for detecting string formats"""
 
     # Regular expressions for various formats
-    EMAIL_PATTERN = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
-    UUID_PATTERN = re.compile(
-        r"^[0-9a-f]{8}-[0-9a-f]{4}-[1-5][0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$",
-        re.I,
-    )
-    DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
-    DATETIME_PATTERN = re.compile(
-        r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:\d{2})$"
-    )
-    URI_PATTERN = re.compile(r"^https?://[^\s/$.?#].[^\s]*$", re.I)
-    IPV4_PATTERN = re.compile(
-        r"^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}"
-        r"(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$"
+    EMAIL_PATTERN = re.compile(f"^{_SOURCES['email']}$")
+    UUID_PATTERN = re.compile(f"^{_SOURCES['uuid']}$")
+    DATE_PATTERN = re.compile(f"^{_SOURCES['date']}$")
+    DATETIME_PATTERN = re.compile(f"^{_SOURCES['date_time']}$")
+    URI_PATTERN = re.compile(f"^{_SOURCES['uri']}$")
+    IPV4_PATTERN = re.compile(f"^{_SOURCES['ipv4']}$")
+
+    # All formats in one pass; alternatives are tried in the same order as above
+    _COMBINED_PATTERN = re.compile(
+        "^(?:" + "|".join(f"(?P<{group}>{source})" for group, _f, source in _FORMATS) + ")$"
     )
+    _GROUP_TO_FORMAT = {group: fmt for group, fmt, _source in _FORMATS}
+    # Every format contains at least one of these characters
+    _MARKERS = frozenset("@-:.")
 
     @classmethod
     def detect_format(cls, value: str) -> Optional[str]:
@@ -35,18 +64,23 @@ class FormatDetector:
         if not isinstance(value, str) or not value:
             return None
 
-        # Check formats from more specific to less specific
-        if cls.EMAIL_PATTERN.match(value):
-            return "email"
-        elif cls.UUID_PATTERN.match(value):
-            return "uuid"
-        elif cls.DATETIME_PATTERN.match(value):
-            return "date-time"
-        elif cls.DATE_PATTERN.match(value):
-            return "date"
-        elif cls.URI_PATTERN.match(value):
-            return "uri"
-        elif cls.IPV4_PATTERN.match(value):
-            return "ipv4"
-
-        return None
+        # Plain words can't match any format – skip the regex entirely
+        if cls._MARKERS.isdisjoint(value):
+            return None
+
+        if len(value) <= _CACHE_MAX_LEN:
+            return FormatDetector._match_cached(value)
+        return FormatDetector._match(value)
+
+    @staticmethod
+    def _match(value: str) -> Optional[str]:
+        match = FormatDetector._COMBINED_PATTERN.match(value)
+        if match is None or match.lastgroup is None:
+            return None
+        return FormatDetector._GROUP_TO_FORMAT[match.lastgroup]
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _match_cached(value: str) -> Optional[str]:
+        # statuses, dates, hosts and similar values repeat a lot in real payloads
+        return FormatDetector._match(value)
@@ -10,13 +10,18 @@
                 of validator settings.
 """
 
-from typing import Any, Dict, Literal
+from typing import Any, Dict, List, Literal, Set, Tuple, Union
 
 from genson import SchemaBuilder  # type: ignore[import-untyped]
 
 from .format_detector import FormatDetector
 
 _FormatMode = Literal["on", "off", "safe"]
+# Path of a node inside the document: ("root", "key", 0, ...)
+_Path = Tuple[Union[str, int], ...]
+# Exact types of JSON leaves that never carry a format: one set lookup skips them.
+# Anything else (str, containers, subclasses) is pushed and dispatched by isinstance.
+_LEAF_TYPES = frozenset({int, float, bool, type(None)})
 
 
 class JsonToSchemaConverter(SchemaBuilder):
@@ -35,21 +40,24 @@ class JsonToSchemaConverter(SchemaBuilder):
         if format_mode not in {"on", "off", "safe"}:
             raise ValueError("format_mode must be 'on', 'off', or 'safe'.")
         self._format_mode: _FormatMode = format_mode
-        self._format_cache: Dict[str, set[str]] = {}
+        self._want_formats: bool = format_mode != "off"
+        self._format_cache: Dict[_Path, set[str]] = {}
 
     # ------------------------------------------------------------------
     # Public API (overrides)
     # ------------------------------------------------------------------
-    def add_object(self, obj: Any, path: str = "root") -> None:
+    def add_object(self, obj: Any, path: Union[str, _Path] = "root") -> None:
         super().add_object(obj)
-        if self._format_mode != "off":
-            self._collect_formats(obj, path)
+        if self._want_formats:
+            self._collect_formats(obj, (path,) if isinstance(path, str) else path)
 
     def to_schema(self) -> Dict[str, Any]:
         schema = dict(super().to_schema())  # shallow‑copy
 
-        if self._format_mode != "off":
-            self._inject_formats(schema, "root")
+        if self._want_formats:
+            # nothing was detected – the schema walk would only do empty lookups
+            if self._format_cache:
+                self._inject_formats(schema, ("root",), set())
 
             if self._format_mode == "safe":
                 schema.setdefault(
@@ -67,34 +75,57 @@ class JsonToSchemaConverter(SchemaBuilder):
     # ------------------------------------------------------------------
     # Internals
     # ------------------------------------------------------------------
-    def _collect_formats(self, obj: Any, path: str) -> None:
-        if isinstance(obj, str):
-            fmt = FormatDetector.detect_format(obj)
-            if fmt:
-                self._format_cache.setdefault(path, set()).add(fmt)
-        elif isinstance(obj, dict):
-            for k, v in obj.items():
-                self._collect_formats(v, f"{path}.{k}")
-        elif isinstance(obj, (list, tuple)):
-            for i, item in enumerate(obj):
-                self._collect_formats(item, f"{path}[{i}]")
-
-    def _inject_formats(self, schema: Dict[str, Any], path: str) -> None:
-        t = schema.get("type")
-        if t == "string":
-            fmts = self._format_cache.get(path)
-            if fmts and len(fmts) == 1:
-                schema["format"] = next(iter(fmts))
-        elif t == "object" and "properties" in schema:
-            for name, subschema in schema["properties"].items():
-                self._inject_formats(subschema, f"{path}.{name}")
-        elif t == "array" and "items" in schema:
-            items_schema = schema["items"]
-            if isinstance(items_schema, dict):
-                self._inject_formats(items_schema, f"{path}[0]")
-            else:
-                for idx, subschema in enumerate(items_schema):
-                    self._inject_formats(subschema, f"{path}[{idx}]")
-        elif "anyOf" in schema:
-            for subschema in schema["anyOf"]:
-                self._inject_formats(subschema, path)
+    def _collect_formats(self, obj: Any, path: _Path) -> None:
+        # explicit stack instead of recursion: no frame per node, no recursion limit
+        stack: List[Tuple[Any, _Path]] = [(obj, path)]
+        while stack:
+            node, node_path = stack.pop()
+            if isinstance(node, str):
+                fmt = FormatDetector.detect_format(node)
+                if fmt:
+                    self._format_cache.setdefault(node_path, set()).add(fmt)
+            elif isinstance(node, dict):
+                # numbers, booleans and null carry no format – don't even push them
+                stack.extend(
+                    (v, node_path + (k,)) for k, v in node.items() if v.__class__ not in _LEAF_TYPES
+                )
+            elif isinstance(node, (list, tuple)):
+                stack.extend(
+                    (item, node_path + (i,))
+                    for i, item in enumerate(node)
+                    if item.__class__ not in _LEAF_TYPES
+                )
+
+    def _inject_formats(
+        self, schema: Dict[str, Any], path: _Path, visited: Set[Tuple[int, _Path]]
+    ) -> None:
+        stack: List[Tuple[Dict[str, Any], _Path]] = [(schema, path)]
+        while stack:
+            node, node_path = stack.pop()
+            # injection is idempotent, so a node shared between branches is walked once
+            key = (id(node), node_path)
+            if key in visited:
+                continue
+            visited.add(key)
+
+            t = node.get("type")
+            if t == "string":
+                fmts = self._format_cache.get(node_path)
+                if fmts and len(fmts) == 1:
+                    node["format"] = next(iter(fmts))
+            elif t == "object" and "properties" in node:
+                stack.extend(
+                    (subschema, node_path + (name,))
+                    for name, subschema in node["properties"].items()
+                )
+            elif t == "array" and "items" in node:
+                items_schema = node["items"]
+                if isinstance(items_schema, dict):
+                    stack.append((items_schema, node_path + (0,)))
+                else:
+                    stack.extend(
+                        (subschema, node_path + (idx,))
+                        for idx, subschema in enumerate(items_schema)
+                    )
+            elif "anyOf" in node:
+                stack.extend((subschema, node_path) for subschema in node["anyOf"])
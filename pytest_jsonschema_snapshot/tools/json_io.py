@@ -0,0 +1,176 @@
+"""JSON (de)serialization for snapshot files.
+
+Uses `orjson` when it is installed and falls back to the standard library
+otherwise. Both backends write two-space indentation and non-ASCII characters
+as UTF-8. Floats in exponent notation may be spelled differently (``1e20``
+vs ``1e+20``) but parse to the same value. NaN and ±Infinity, which orjson
+would silently turn into ``null``, are always written by the standard library.
+"""
+
+import hashlib
+import itertools
+import json
+import math
+import os
+import re
+from pathlib import Path
+from typing import Any, Optional
+
+try:
+    import orjson
+
+    _HAS_ORJSON = True
+except ImportError:  # pragma: no cover - depends on the environment
+    _HAS_ORJSON = False
+
+# номер временного файла внутри процесса; вместе с pid даёт уникальное имя
+_TMP_COUNTER = itertools.count()
+_TMP_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+
+
+# orjson читает целые шире 64 бит как float; такие литералы отдаём stdlib
+_LONG_NUMBER = re.compile(rb"\d{20,}")
+
+
+def loads(data: bytes) -> Any:
+    """Parses UTF-8 encoded JSON."""
+    if _HAS_ORJSON and not _LONG_NUMBER.search(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # NaN/Infinity пишет только stdlib – им же и читаем
+    return json.loads(data)
+
+
+def _has_non_finite(obj: Any) -> bool:
+    """Tells whether *obj* contains NaN or ±Infinity anywhere."""
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, float):
+            if not math.isfinite(node):
+                return True
+        elif isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, (list, tuple)):
+            stack.extend(node)
+    return False
+
+
+def _orjson_dumps(obj: Any, option: int) -> Optional[bytes]:
+    """
+    Serializes with orjson, or returns None when only the stdlib can write
+    *obj* faithfully.
+    """
+    try:
+        data = orjson.dumps(obj, option=option)
+    except TypeError:
+        return None  # e.g. integers wider than 64 bit
+    # orjson пишет NaN и ±Infinity как null; без null в выводе их точно нет
+    if b"null" in data and _has_non_finite(obj):
+        return None
+    return data
+
+
+def dumps(obj: Any) -> bytes:
+    """Serializes *obj* the way snapshot files are stored on disk."""
+    if _HAS_ORJSON:
+        data = _orjson_dumps(obj, orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        if data is not None:
+            return data
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def write_file(path: Path, obj: Any) -> bytes:
+    """
+    Writes *obj* to *path* with a single write into a temporary file that
+    then atomically replaces the target, so readers never see a half-written
+    snapshot.
+
+    Returns:
+        the bytes written
+    """
+    data = dumps(obj)
+    # уникальное имя: под xdist один и тот же файл могут писать несколько воркеров
+    while True:
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{next(_TMP_COUNTER)}.tmp")
+        try:
+            # 0o666 с учётом umask – права как у обычного open(), в отличие от mkstemp
+            fd = os.open(tmp_path, _TMP_FLAGS, 0o666)
+        except FileExistsError:
+            continue  # остался от упавшего процесса с тем же pid
+        break
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return data
+
+
+def _canonical(obj: Any, sort_keys: bool = True) -> bytes:
+    """Compact UTF-8 JSON."""
+    if _HAS_ORJSON:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        data = _orjson_dumps(obj, option)
+        if data is not None:
+            return data
+    return json.dumps(obj, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False).encode(
+        "utf-8"
+    )
+
+
+def fingerprint(obj: Any) -> bytes:
+    """
+    Returns a short digest of *obj* that does not depend on key order.
+    Equal digests mean equal JSON documents. Values that Python treats as
+    equal but JSON does not (``1``, ``1.0`` and ``true``) hash differently.
+
+    Digests are meant for in-process caches: orjson and the standard library
+    spell some floats differently (``1e20`` vs ``1e+20``), so a digest is
+    only comparable with digests made by the same backend.
+    """
+    return hashlib.blake2b(_canonical(obj), digest_size=16).digest()
+
+
+def ordered_fingerprint(obj: Any) -> bytes:
+    """
+    Like :func:`fingerprint`, but key order matters and the keys are not
+    sorted first. Use it when the order ends up in the result, e.g. the order
+    of ``properties`` in a schema built from the data.
+    """
+    return hashlib.blake2b(_canonical(obj, sort_keys=False), digest_size=16).digest()
+
+
+_PLAIN_SCALARS = frozenset({str, int, bool, type(None)})
+
+
+def is_plain(obj: Any) -> bool:
+    """
+    Tells whether *obj* is built only from plain JSON types: ``dict`` with
+    ``str`` keys, ``list``, ``str``, ``int``, ``bool``, ``None`` and
+    finite ``float``. Only for such data the serialized form keeps every type,
+    so it can stand in for the data itself (e.g. as a cache key).
+    """
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        cls = node.__class__
+        if cls in _PLAIN_SCALARS:
+            continue
+        if cls is float:
+            if not math.isfinite(node):
+                return False
+        elif cls is dict:
+            # {1: "x"} и {"1": "x"} сериализуются одинаково
+            if not all(key.__class__ is str for key in node):
+                return False
+            stack.extend(node.values())
+        elif cls is list:
+            stack.extend(node)
+        else:
+            # tuple, datetime, UUID, Enum, подклассы – JSON их не различает
+            return False
+    return True
@@ -3,8 +3,8 @@ from __future__ import annotations
 import inspect
 import re
 import types
-from functools import partial
-from typing import Callable, List, Optional, TypedDict
+from functools import lru_cache, partial
+from typing import Callable, List, Optional, Tuple, TypedDict, Union
 
 # ──────────────────────────── Типы ────────────────────────────
 _Meta = TypedDict(
@@ -12,12 +12,16 @@ _Meta = TypedDict(
     {
         "package": str,
         "package_full": str,
+        "package_parts": List[str],
         "path_parts": List[str],
         "class": Optional[str],
         "method": str,
     },
 )
 
+# Разобранное правило: литералы и плейсхолдеры вида (name, joiner)
+_Token = Union[str, Tuple[str, Optional[str]]]
+
 
 # ──────────────────────────── Класс ───────────────────────────
 class NameMaker:
@@ -49,6 +53,7 @@ class NameMaker:
     """
 
     _RE_PLHDR = re.compile(r"\{([^{}]+)\}")
+    _RE_COLLAPSE = re.compile(r"/{2,}|\.{2,}|-{2,}")
 
     # ───────────────────────────── PUBLIC ──────────────────────────────
     @staticmethod
@@ -56,18 +61,45 @@ class NameMaker:
         """
         Render *rule* using metadata extracted from *obj*.
         """
-        meta: _Meta = NameMaker._meta(obj)
-
-        def _sub(match: re.Match[str]) -> str:  # noqa: N802
-            token: str | None = match.group(1)
-            name: str = token.split("=", 1)[0] if token else ""
-            joiner: str | None = token.split("=", 1)[1] if token and "=" in token else None
-            return NameMaker._expand(name, joiner, meta)
-
-        out = NameMaker._RE_PLHDR.sub(_sub, rule)
-        return NameMaker._collapse(out)
+        module, qualname = NameMaker._origin(obj)
+        return NameMaker._format_lru(module, qualname, rule)
 
     # ──────────────────────────── INTERNAL ────────────────────────────
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _format_lru(module: str, qualname: str, rule: str) -> str:
+        # the same test function is usually named many times (parametrize, loops);
+        # the key holds only strings, so no test instance is kept alive
+        meta: _Meta = NameMaker._meta_lru(module, qualname)
+
+        # plain loop over the pre-split rule, hot names bound to locals
+        expand = NameMaker._expand
+        parts: List[str] = []
+        append = parts.append
+        for token in NameMaker._compile(rule):
+            if isinstance(token, str):
+                append(token)
+            else:
+                append(expand(token[0], token[1], meta))
+        return NameMaker._collapse("".join(parts))
+
+    # rule parsing ------------------------------------------------------
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _compile(rule: str) -> Tuple[_Token, ...]:
+        """Split *rule* into literals and placeholders once per distinct rule."""
+        tokens: List[_Token] = []
+        pos = 0
+        for match in NameMaker._RE_PLHDR.finditer(rule):
+            if match.start() > pos:
+                tokens.append(rule[pos : match.start()])
+            name, sep, joiner = match.group(1).partition("=")
+            tokens.append((name, joiner if sep else None))
+            pos = match.end()
+        if pos < len(rule):
+            tokens.append(rule[pos:])
+        return tuple(tokens)
+
     # metadata ----------------------------------------------------------
     @staticmethod
     def _unwrap(obj: Callable[..., object]) -> Callable[..., object]:
@@ -76,32 +108,36 @@ class NameMaker:
             if isinstance(obj, partial):
                 obj = obj.func
                 continue
-            if hasattr(obj, "__wrapped__"):
-                obj = obj.__wrapped__
-                continue
-            break
-        return obj
+            # EAFP: one attribute lookup instead of hasattr() + access
+            try:
+                obj = obj.__wrapped__  # type: ignore[attr-defined]
+            except AttributeError:
+                return obj
 
     @staticmethod
-    def _meta(obj: Callable[..., object]) -> _Meta:
-        """Return mapping used during placeholder substitution."""
+    def _origin(obj: Callable[..., object]) -> Tuple[str, str]:
+        """Return ``(module, qualname)`` of the callable behind *obj*."""
         obj = NameMaker._unwrap(obj)
 
         # 1) built-in function (len, sum, …)
         if inspect.isbuiltin(obj) or isinstance(obj, types.BuiltinFunctionType):
-            qualname = obj.__name__
-            module = obj.__module__ or "builtins"
+            return obj.__module__ or "builtins", obj.__name__
 
         # 2) callable instance (defines __call__)
-        elif not (inspect.isfunction(obj) or inspect.ismethod(obj)):
-            qualname = f"{obj.__class__.__qualname__}.__call__"
-            module = obj.__class__.__module__
+        if not (inspect.isfunction(obj) or inspect.ismethod(obj)):
+            return obj.__class__.__module__, f"{obj.__class__.__qualname__}.__call__"
 
         # 3) regular function / bound or unbound method
-        else:
-            qualname = obj.__qualname__
-            module = obj.__module__
+        return obj.__module__, obj.__qualname__
 
+    @staticmethod
+    def _meta(obj: Callable[..., object]) -> _Meta:
+        """Return mapping used during placeholder substitution."""
+        return NameMaker._meta_lru(*NameMaker._origin(obj))
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _meta_lru(module: str, qualname: str) -> _Meta:
         parts: List[str] = qualname.split(".")
         cls: Optional[str] = None
         if len(parts) > 1 and parts[-2] != "<locals>":
@@ -112,6 +148,7 @@ class NameMaker:
         return {
             "package": module,
             "package_full": module,
+            "package_parts": mod_parts,
             "path_parts": mod_parts[1:] if len(mod_parts) > 1 else [],
             "class": cls,
             "method": method,
@@ -124,7 +161,7 @@ class NameMaker:
             return m["package"]
         if name == "package_full":
             sep = joiner if joiner is not None else "."
-            return sep.join(m["package_full"].split("."))
+            return sep.join(m["package_parts"])  # split once in _meta
         if name == "path":
             if not m["path_parts"]:
                 return ""
@@ -146,8 +183,8 @@ class NameMaker:
     # post-processing ---------------------------------------------------
     @staticmethod
     def _collapse(s: str) -> str:
-        # collapse critical duplicates but keep double underscores
-        s = re.sub(r"/{2,}", "/", s)  # '//' → '/'
-        s = re.sub(r"\.{2,}", ".", s)  # '..' → '.'
-        s = re.sub(r"-{2,}", "-", s)  # '--' → '-'
-        return s
+        # collapse critical duplicates ('//', '..', '--') in one pass,
+        # but keep double underscores
+        if "//" not in s and ".." not in s and "--" not in s:
+            return s  # обычный случай: substring-поиск дешевле вызова re.sub с callback
+        return NameMaker._RE_COLLAPSE.sub(lambda m: m.group(0)[0], s)
@@ -0,0 +1,32 @@
+from pathlib import Path
+from typing import Callable, Optional
+
+import pytest
+from jsonschema_diff import ConfigMaker, JsonSchemaDiff
+from jsonschema_diff.color import HighlighterPipeline
+
+from pytest_jsonschema_snapshot.core import SchemaShot
+
+ACTIONS = {"add": True, "update": True, "delete": True}
+
+
+@pytest.fixture
+def make_shot(tmp_path) -> Callable[..., SchemaShot]:
+    """
+    Фабрика SchemaShot над `tmp_path` (или `root_dir`).
+    Переданные *files* заранее создаются в директории снимков.
+    """
+
+    def factory(*files: str, root_dir: Optional[Path] = None, **kwargs) -> SchemaShot:
+        root = tmp_path if root_dir is None else root_dir
+        if files:
+            snapshot_dir = root / "__snapshots__"
+            snapshot_dir.mkdir(parents=True, exist_ok=True)
+            for name in files:
+                (snapshot_dir / name).write_text("{}", encoding="utf-8")
+
+        differ = JsonSchemaDiff(ConfigMaker.make(), HighlighterPipeline([]))
+        kwargs.setdefault("update_actions", dict(ACTIONS))
+        return SchemaShot(root, differ, **kwargs)
+
+    return factory
@@ -0,0 +1,304 @@
+import json
+from collections import OrderedDict
+
+import pytest
+from genson import SchemaGenerationError
+
+from pytest_jsonschema_snapshot import core
+from pytest_jsonschema_snapshot.stats import SchemaStats
+
+
+@pytest.fixture(autouse=True)
+def isolated_stats(monkeypatch):
+    """Не засоряем итоговую сводку плагина схемами из временных директорий."""
+    stats = SchemaStats()
+    monkeypatch.setattr(core, "GLOBAL_STATS", stats)
+    return stats
+
+
+def test_schema_file_is_read_once(make_shot):
+    """Повторные проверки одной и той же схемы не должны заново читать файл."""
+    shot = make_shot(update_mode=True)
+    shot.assert_json_match({"a": 1}, "cached")
+
+    # Портим файл на диске: если кэш работает, SchemaShot этого не заметит
+    (shot.snapshot_dir / "cached.schema.json").write_text("not json", encoding="utf-8")
+
+    assert shot.assert_json_match({"a": 2}, "cached") is False
+
+
+def test_missing_schema_is_cached(make_shot):
+    """Отсутствие файла тоже запоминается, а запись схемы обновляет кэш."""
+    shot = make_shot(update_mode=True)
+    schema_path = shot.snapshot_dir / "missing.schema.json"
+
+    assert shot._load_schema(schema_path) == (False, None)
+
+    assert shot.assert_json_match({"a": 1}, "missing") is None
+    exists, schema = shot._load_schema(schema_path)
+    assert exists
+    assert schema == json.loads(schema_path.read_text(encoding="utf-8"))
+
+
+def test_missing_schema_without_update_fails(make_shot):
+    shot = make_shot()
+    with pytest.raises(pytest.fail.Exception):
+        shot.assert_json_match({"a": 1}, "absent")
+
+
+def test_snapshot_dir_is_scanned_once(make_shot):
+    """Файлы, появившиеся после сканирования директории, не видны без записи через SchemaShot."""
+    shot = make_shot(update_mode=True)
+    assert shot.snapshot_files() == set()
+
+    shot.assert_json_match({"a": 1}, "written")
+    (shot.snapshot_dir / "foreign.schema.json").write_text("{}", encoding="utf-8")
+
+    assert shot.snapshot_files() == {"written.schema.json"}
+
+
+def test_schema_created_after_scan_is_found(make_shot):
+    """Схему, созданную другим процессом (воркером xdist) после сканирования, видно."""
+    shot = make_shot(update_mode=True)
+    assert shot.snapshot_files() == set()
+
+    other = make_shot(update_mode=True)
+    assert other.assert_json_match({"a": 1}, "shared") is None
+
+    assert shot.assert_json_match({"a": 2}, "shared") is False
+
+
+def test_validator_is_reused_and_checks_formats(make_shot):
+    """Валидатор строится один раз на схему и по-прежнему проверяет форматы."""
+    shot = make_shot(update_mode=True, update_actions={"add": True})
+    shot.assert_json_match({"email": "user@example.com"}, "emails")
+    shot.assert_json_match({"email": "other@example.com"}, "emails")
+    assert len(shot._validator_cache) == 1
+
+    with pytest.raises(pytest.fail.Exception, match="Validation error in `emails`"):
+        shot.assert_json_match({"email": "not-an-email"}, "emails")
+
+
+def test_validation_error_on_equal_schemas_skips_diff(make_shot, monkeypatch):
+    """Если схемы совпали, diff не рендерится даже при ошибке валидации."""
+    shot = make_shot(update_mode=True)
+    schema = {"type": "string", "format": "email"}
+    shot.assert_schema_match(schema, "equal")
+
+    def _fail(*_args, **_kwargs):
+        raise AssertionError("differ must not be called")
+
+    monkeypatch.setattr(shot.differ, "compare", _fail)
+    with pytest.raises(pytest.fail.Exception, match="Validation error in `equal`"):
+        shot.assert_schema_match(schema, "equal", data="nope")
+
+
+def test_identical_data_reuses_built_schema(make_shot, monkeypatch):
+    """Одинаковые данные не должны заново прогоняться через genson."""
+    monkeypatch.setattr(core, "_SCHEMA_BUILD_CACHE", OrderedDict())
+    shot = make_shot(update_mode=True)
+    data = {"id": 1, "email": "user@example.com"}
+
+    first = shot._build_schema(data)
+    monkeypatch.setattr(core, "JsonToSchemaConverter", None)  # повторная сборка упадёт
+    second = shot._build_schema(dict(data))
+
+    assert first == second
+    assert first is not second
+
+
+def test_cached_schema_fingerprint_is_reused(make_shot, monkeypatch):
+    """Для повторных данных отпечаток схемы берётся из кэша сборки, а не считается заново."""
+    monkeypatch.setattr(core, "_SCHEMA_BUILD_CACHE", OrderedDict())
+    shot = make_shot(update_mode=True)
+    data = {"id": 1, "tags": ["a"]}
+    shot.assert_json_match(data, "fp_reuse")
+
+    calls = []
+    fingerprint = core.json_io.fingerprint
+
+    def counting_fingerprint(obj):
+        calls.append(1)
+        return fingerprint(obj)
+
+    monkeypatch.setattr(core.json_io, "fingerprint", counting_fingerprint)
+    for _ in range(3):
+        assert shot.assert_json_match(dict(data), "fp_reuse") is False
+
+    assert calls == []
+
+
+def test_reordered_data_keeps_its_property_order(make_shot, monkeypatch):
+    """Кэш сборки различает порядок ключей: он попадает в порядок properties схемы."""
+    monkeypatch.setattr(core, "_SCHEMA_BUILD_CACHE", OrderedDict())
+    shot = make_shot(update_mode=True)
+
+    assert list(shot._build_schema({"a": 1, "b": "x"})["properties"]) == ["a", "b"]
+    assert list(shot._build_schema({"b": "x", "a": 1})["properties"]) == ["b", "a"]
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [
+        ({"v": float("nan")}, {"v": None}),
+        ({1: "x"}, {"1": "x"}),
+    ],
+    ids=["nan-null", "int-key-str-key"],
+)
+def test_build_cache_keeps_types_apart(make_shot, monkeypatch, first, second):
+    """Данные, которые совпадают только после сериализации, не делят схему из кэша."""
+    monkeypatch.setattr(core, "_SCHEMA_BUILD_CACHE", OrderedDict())
+    shot = make_shot(update_mode=True)
+
+    expected = shot._build_schema(second)
+    monkeypatch.setattr(core, "_SCHEMA_BUILD_CACHE", OrderedDict())
+    shot._build_schema(first)
+
+    assert shot._build_schema(second) == expected
+
+
+def test_lone_surrogate_is_built_without_cache(make_shot, monkeypatch):
+    """Строка, которую нельзя закодировать в UTF-8, не ломает ключ кэша сборки."""
+    monkeypatch.setattr(core, "_SCHEMA_BUILD_CACHE", OrderedDict())
+    shot = make_shot(update_mode=True)
+    shot.assert_json_match({"a": "x"}, "surrogate")
+
+    assert shot.assert_json_match({"a": "\ud800"}, "surrogate") is False
+    assert len(core._SCHEMA_BUILD_CACHE) == 1
+
+
+def test_tuple_does_not_reuse_list_schema(make_shot, monkeypatch):
+    """Кортеж не получает схему списка из кэша: результат не зависит от порядка тестов."""
+    monkeypatch.setattr(core, "_SCHEMA_BUILD_CACHE", OrderedDict())
+    shot = make_shot(update_mode=True)
+    shot._build_schema({"a": ["x"]})
+
+    with pytest.raises(SchemaGenerationError):
+        shot._build_schema({"a": ("x",)})
+
+
+def test_invalid_name_raises_value_error(make_shot):
+    shot = make_shot(update_mode=True)
+    with pytest.raises(ValueError, match="Invalid schema name"):
+        shot.assert_json_match({"a": 1}, "bad/name")
+
+
+def test_instances_do_not_stack_log_handlers(make_shot, tmp_path):
+    before = len(core.logger.handlers)
+    make_shot(root_dir=tmp_path / "one")
+    make_shot(root_dir=tmp_path / "two")
+    assert len(core.logger.handlers) == before
+
+
+def test_same_diff_is_rendered_once(make_shot, monkeypatch, isolated_stats):
+    """Повторные незакоммиченные изменения рендерят diff только один раз."""
+    shot = make_shot(update_mode=True, update_actions={"add": True})
+    shot.assert_json_match({"a": 1}, "diffed")
+
+    calls = []
+    compare = shot.differ.compare
+
+    def counting_compare(old, new):
+        calls.append(1)
+        return compare(old, new)
+
+    monkeypatch.setattr(shot.differ, "compare", counting_compare)
+    for _ in range(3):
+        shot.assert_json_match({"a": 1, "b": "x"}, "diffed")
+    assert len(calls) == 1
+
+    assert isolated_stats.uncommitted_diffs["diffed.schema.json"]
+    assert len(calls) == 1
+
+
+def test_uncommitted_diff_ignores_later_schema_changes(make_shot, isolated_stats):
+    """Diff незакоммиченной схемы не зависит от того, что вызывающий код сделает с ней потом."""
+    shot = make_shot(update_mode=True, update_actions={"add": True})
+    shot.assert_json_match({"a": 1}, "frozen")
+    data = {"a": 1, "b": "x"}
+    schema = shot._build_schema(data)
+    shot.assert_schema_match(schema, "frozen", data=data)
+
+    schema["properties"].clear()
+
+    stored = json.loads((shot.snapshot_dir / "frozen.schema.json").read_text(encoding="utf-8"))
+    expected = shot.differ.compare(stored, shot._build_schema(data)).render()
+
+    assert isolated_stats.uncommitted_diffs["frozen.schema.json"] == expected
+
+
+def test_missing_files_are_not_probed_again(make_shot, monkeypatch):
+    """Отсутствие схемы и оригинала проверяется на диске один раз, дальше берётся из кэша."""
+    shot = make_shot(update_mode=True, update_actions={"delete": True})
+    with pytest.raises(pytest.fail.Exception, match="adding new schemas is disabled"):
+        shot.assert_json_match({"a": 1}, "absent")
+    shot._save_process_original("absent", None, {"a": 1})
+
+    def _no_fs(*_args, **_kwargs):
+        raise AssertionError("filesystem must not be touched")
+
+    monkeypatch.setattr(core.Path, "exists", _no_fs)
+    monkeypatch.setattr(core.Path, "is_file", _no_fs)
+    monkeypatch.setattr(core.os, "scandir", _no_fs)
+    for _ in range(2):
+        with pytest.raises(pytest.fail.Exception, match="adding new schemas is disabled"):
+            shot.assert_json_match({"a": 1}, "absent")
+        shot._save_process_original("absent", None, {"a": 1})
+
+
+@pytest.mark.parametrize(
+    "name",
+    ["get_data", "TestDataClass.get_data.first", "data-1", "имя", "CONx", "x.CON"],
+)
+def test_valid_names_are_accepted(name):
+    assert core._validate_name(name) == name
+
+
+@pytest.mark.parametrize("name", ["a/b", "a\0b", "a" * 256])
+def test_invalid_names_are_rejected(name):
+    with pytest.raises(ValueError, match="Invalid schema name"):
+        core._validate_name(name)
+
+
+def test_written_schema_keeps_its_fingerprint(make_shot):
+    """После перезаписи схемы её отпечаток берётся из уже посчитанного, а не сбрасывается."""
+    shot = make_shot(reset_mode=True)
+    shot.assert_json_match({"a": 1}, "fp")
+    shot.assert_json_match({"a": "x"}, "fp")
+
+    exists, stored = shot._load_schema(shot.snapshot_dir / "fp.schema.json")
+    assert exists
+    assert shot._schema_hash_cache["fp.schema.json"] == core.json_io.fingerprint(stored)
+
+
+def test_cached_schema_is_not_aliased_to_caller_dict(make_shot):
+    """Изменение переданного dict после записи не должно менять закэшированную схему."""
+    shot = make_shot(update_mode=True)
+    schema = {"type": "object", "properties": {"a": {"type": "string"}}}
+    assert shot.assert_schema_match(schema, "aliased") is None
+
+    schema["properties"]["a"]["type"] = "integer"
+    assert shot.assert_schema_match(schema, "aliased") is True
+
+    stored = json.loads((shot.snapshot_dir / "aliased.schema.json").read_text(encoding="utf-8"))
+    assert stored["properties"]["a"] != {"type": "string"}
+
+
+def test_json_types_are_not_conflated(make_shot):
+    """`true` и `1` равны в Python, но в JSON Schema это разные схемы."""
+    shot = make_shot(reset_mode=True)
+    shot.assert_schema_match({"const": True}, "const")
+    assert shot.assert_schema_match({"const": 1}, "const") is True
+    assert shot.assert_schema_match({"const": 1}, "const") is False
+
+
+def test_matching_schema_records_no_stats(make_shot, isolated_stats):
+    """Совпавшая схема не должна попадать в статистику незакоммиченных изменений."""
+    shot = make_shot(update_mode=True)
+    shot.assert_json_match({"a": 1}, "same")
+    isolated_stats.created.clear()
+
+    for _ in range(3):
+        assert shot.assert_json_match({"a": 2}, "same") is False
+
+    assert not isolated_stats.has_any_info()
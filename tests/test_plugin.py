@@ -0,0 +1,84 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from jsonschema_diff import JsonSchemaDiff
+
+from pytest_jsonschema_snapshot.plugin import _get_differ, cleanup_unused_schemas
+from pytest_jsonschema_snapshot.stats import SchemaStats
+
+
+def test_cleanup_deletes_unused_schema_with_original(make_shot):
+    shot = make_shot("used.schema.json", "stale.schema.json", "stale.json")
+    shot.used_schemas.add("used.schema.json")
+
+    stats = SchemaStats()
+    cleanup_unused_schemas(shot, True, shot.update_actions, stats)
+
+    assert sorted(p.name for p in shot.snapshot_dir.iterdir()) == ["used.schema.json"]
+    assert stats.deleted == ["stale.schema.json", "stale.json"]
+
+
+def test_cleanup_only_reports_unused_without_update(make_shot):
+    shot = make_shot("stale.schema.json")
+
+    stats = SchemaStats()
+    cleanup_unused_schemas(shot, False, shot.update_actions, stats)
+
+    assert stats.unused == ["stale.schema.json"]
+    assert (shot.snapshot_dir / "stale.schema.json").exists()
+
+
+def test_cleanup_does_nothing_when_all_schemas_are_used(make_shot):
+    shot = make_shot("used.schema.json")
+    shot.used_schemas.add("used.schema.json")
+
+    stats = SchemaStats()
+    cleanup_unused_schemas(shot, True, shot.update_actions, stats)
+
+    assert not stats.has_any_info()
+
+
+def test_cleanup_deletes_many_schemas_in_parallel(make_shot):
+    names = [f"stale_{i:02}" for i in range(40)]
+    files = [f"{n}.schema.json" for n in names] + [f"{n}.json" for n in names[::2]]
+    shot = make_shot(*files)
+
+    stats = SchemaStats()
+    cleanup_unused_schemas(shot, True, shot.update_actions, stats)
+
+    assert list(shot.snapshot_dir.iterdir()) == []
+    assert sorted(stats.deleted) == sorted(files)
+    # порядок в статистике детерминирован: схема, затем её оригинал
+    assert stats.deleted[:3] == ["stale_00.schema.json", "stale_00.json", "stale_01.schema.json"]
+    assert shot.snapshot_files() == set()
+
+
+def test_parallel_cleanup_touches_caches_only_in_main_thread(make_shot, monkeypatch):
+    """Потоки удаления только удаляют файлы: кэш SchemaShot меняется в основном потоке."""
+    names = [f"stale_{i:02}" for i in range(20)]
+    shot = make_shot(*[f"{n}.schema.json" for n in names], *[f"{n}.json" for n in names])
+    threads = set()
+    for method in ("file_exists", "forget_file"):
+        original = getattr(shot, method)
+
+        def recording(name, _original=original):
+            threads.add(threading.get_ident())
+            return _original(name)
+
+        monkeypatch.setattr(shot, method, recording)
+
+    cleanup_unused_schemas(shot, True, shot.update_actions, SchemaStats())
+
+    assert threads == {threading.get_ident()}
+    assert list(shot.snapshot_dir.iterdir()) == []
+
+
+def test_differ_is_built_once_per_session():
+    """Все директории снимков одной сессии используют один и тот же differ."""
+    config = SimpleNamespace(stash=pytest.Stash())
+
+    differ = _get_differ(config)
+    assert isinstance(differ, JsonSchemaDiff)
+    assert _get_differ(config) is differ
+    assert _get_differ(SimpleNamespace(stash=pytest.Stash())) is not differ
@@ -1,3 +1,7 @@
+import sys
+
+import pytest
+
 from pytest_jsonschema_snapshot.stats import SchemaStats
 
 
@@ -100,3 +104,55 @@ def test_print_summary_hides_unused_in_update_mode():
     output = "\n".join(fake.lines)
 
     assert "Unused schemas".lower() not in output.lower()
+
+
+def test_repeated_names_are_listed_once():
+    """Повторные отметки одной схемы (циклы, parametrize) не дублируют строки сводки."""
+    s = SchemaStats()
+    for _ in range(3):
+        s.add_uncommitted("minor.schema.json", diff="+minor change")
+        s.add_updated("upd.schema.json", diff="+added line")
+        s.add_created("new.schema.json")
+
+    assert s.uncommitted == ["minor.schema.json"]
+    assert s.updated == ["upd.schema.json"]
+    assert s.created == ["new.schema.json"]
+
+
+def test_print_summary_merging_keeps_order_and_lone_originals():
+    """Пары схлопываются на позиции схемы, одиночные .json и прочие имена выводятся как есть."""
+    s = SchemaStats()
+    for name in ("a.json", "b.schema.json", "a.schema.json", "c.json", "other.txt"):
+        s.add_created(name)
+
+    fake = FakeTerminalReporter()
+    s.print_summary(fake, update_mode=False)
+
+    assert fake.lines[2:] == [
+        "  - b.schema.json",
+        "  - a.schema.json + original",
+        "  - c.json",
+        "  - other.txt",
+    ]
+
+
+def test_schema_stats_has_no_instance_dict():
+    """Статистика хранится в слотах, а имена схем интернируются."""
+    stats = SchemaStats()
+    with pytest.raises(AttributeError):
+        stats.extra = 1  # type: ignore[attr-defined]
+
+    name = "".join(["interned", ".schema.json"])
+    stats.add_created(name)
+    assert stats.created[0] is sys.intern("interned.schema.json")
+
+
+def test_diff_is_written_in_one_call():
+    """Строки diff выводятся одним вызовом write_line, пустые строки пропускаются."""
+    s = SchemaStats()
+    s.add_updated("upd.schema.json", diff="+ .a: 1\n\n  \nr .b: x -> y\n")
+
+    fake = FakeTerminalReporter()
+    s.print_summary(fake, update_mode=True)
+
+    assert "      + .a: 1\n      r .b: x -> y" in fake.lines
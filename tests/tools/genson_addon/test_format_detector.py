@@ -0,0 +1,50 @@
+import pytest
+
+from pytest_jsonschema_snapshot.tools.genson_addon.format_detector import FormatDetector
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        ("user@example.com", "email"),
+        ("550E8400-E29B-41D4-A716-446655440000", "uuid"),
+        ("2023-01-01T12:00:00.123+03:00", "date-time"),
+        ("2023-01-01t12:00:00z", None),  # T/Z чувствительны к регистру
+        ("2023-01-01", "date"),
+        ("HTTPS://example.com/path", "uri"),
+        ("192.168.0.1", "ipv4"),
+        ("256.1.1.1", None),
+        ("plain words", None),
+        ("", None),
+        (42, None),
+    ],
+)
+def test_detect_format(value, expected):
+    assert FormatDetector.detect_format(value) == expected
+
+
+@pytest.mark.parametrize(
+    "pattern,value",
+    [
+        (FormatDetector.EMAIL_PATTERN, "user@example.com"),
+        (FormatDetector.UUID_PATTERN, "550e8400-e29b-41d4-a716-446655440000"),
+        (FormatDetector.DATETIME_PATTERN, "2023-01-01T12:00:00Z"),
+        (FormatDetector.DATE_PATTERN, "2023-01-01"),
+        (FormatDetector.URI_PATTERN, "http://example.com"),
+        (FormatDetector.IPV4_PATTERN, "10.0.0.1"),
+    ],
+)
+def test_individual_patterns_still_available(pattern, value):
+    assert pattern.match(value)
+
+
+def test_repeated_values_are_matched_once():
+    """Повторяющиеся короткие строки берутся из кэша, длинные в кэш не попадают."""
+    FormatDetector._match_cached.cache_clear()
+    for _ in range(3):
+        assert FormatDetector.detect_format("user@example.com") == "email"
+    assert FormatDetector._match_cached.cache_info().hits == 2
+
+    long_uri = "https://example.com/" + "a" * 300
+    assert FormatDetector.detect_format(long_uri) == "uri"
+    assert FormatDetector._match_cached.cache_info().currsize == 1
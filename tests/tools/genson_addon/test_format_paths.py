@@ -0,0 +1,81 @@
+from pytest_jsonschema_snapshot.tools import JsonToSchemaConverter
+
+
+def test_dotted_keys_do_not_collide_with_nested_paths():
+    """Ключ "a.b" и вложенный путь a → b — разные узлы и не делят форматы."""
+    conv = JsonToSchemaConverter(format_mode="on")
+    conv.add_object({"a.b": "user@example.com", "a": {"b": "plain text"}})
+    schema = conv.to_schema()
+
+    assert schema["properties"]["a.b"]["format"] == "email"
+    assert "format" not in schema["properties"]["a"]["properties"]["b"]
+
+
+def test_array_item_formats_are_injected():
+    conv = JsonToSchemaConverter(format_mode="on")
+    conv.add_object({"dates": ["2023-01-01", "2024-02-02"]})
+    schema = conv.to_schema()
+
+    assert schema["properties"]["dates"]["items"]["format"] == "date"
+
+
+def test_shared_subschema_is_walked_once():
+    """Один и тот же узел в нескольких ветках anyOf обходится один раз."""
+
+    class CountingCache(dict):
+        lookups = 0
+
+        def get(self, *args):
+            CountingCache.lookups += 1
+            return super().get(*args)
+
+    conv = JsonToSchemaConverter(format_mode="on")
+    conv.add_object({"v": "user@example.com"})
+    conv._format_cache = CountingCache(conv._format_cache)
+
+    shared = {"type": "string"}
+    schema = {"anyOf": [shared, shared, {"anyOf": [shared]}]}
+    conv._inject_formats(schema, ("root", "v"), set())
+
+    assert shared["format"] == "email"
+    assert CountingCache.lookups == 1
+
+
+def test_collecting_formats_does_not_recurse():
+    """Сбор форматов не упирается в лимит рекурсии на глубоко вложенных данных."""
+    depth = 5000
+    data: object = "user@example.com"
+    for _ in range(depth):
+        data = {"n": data}
+
+    conv = JsonToSchemaConverter(format_mode="on")
+    conv._collect_formats(data, ("root",))
+
+    assert conv._format_cache == {("root",) + ("n",) * depth: {"email"}}
+
+
+def test_subclassed_values_are_still_scanned():
+    """Подклассы str/dict/list не считаются листьями и проходят обычную проверку формата."""
+
+    class Email(str):
+        pass
+
+    class Payload(dict):
+        pass
+
+    conv = JsonToSchemaConverter(format_mode="on")
+    conv._collect_formats(Payload(a=[Email("user@example.com"), 1, None]), ("root",))
+
+    assert conv._format_cache == {("root", "a", 0): {"email"}}
+
+
+def test_schema_is_not_walked_without_detected_formats(monkeypatch):
+    """Без найденных форматов схема не обходится, а safe-режим всё равно добавляет $vocabulary."""
+    conv = JsonToSchemaConverter(format_mode="safe")
+    conv.add_object({"a": "plain", "b": [1, 2]})
+
+    def _fail(*_args):
+        raise AssertionError("schema must not be walked")
+
+    monkeypatch.setattr(conv, "_inject_formats", _fail)
+    assert "$vocabulary" in conv.to_schema()
@@ -0,0 +1,150 @@
+import json
+import math
+import os
+import stat
+import sys
+
+import pytest
+
+from pytest_jsonschema_snapshot.tools import json_io
+
+SAMPLE = {
+    "строка": "значение",
+    "число": 1.5,
+    "список": [1, None, True, {}],
+    "пусто": [],
+}
+# Значения, которые orjson не пишет сам (или пишет иначе, чем stdlib)
+STDLIB_ONLY = {
+    "огромное": 2**70 + 1,
+    "nan": float("nan"),
+    "бесконечности": [float("inf"), float("-inf")],
+}
+
+
+@pytest.fixture(params=[True, False], ids=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(json_io, "_HAS_ORJSON", False)
+    return request.param
+
+
+def test_dumps_matches_stdlib_layout(backend):
+    """Оба бэкенда должны писать файлы байт-в-байт как json.dump(indent=2)."""
+    expected = json.dumps(SAMPLE, indent=2, ensure_ascii=False).encode("utf-8")
+    assert json_io.dumps(SAMPLE) == expected
+    assert json_io.loads(expected) == SAMPLE
+
+
+def test_values_orjson_cannot_write_go_through_stdlib(backend):
+    """Большие целые, NaN и ±Infinity сохраняются как у json.dump, а не превращаются в null."""
+    data = {**SAMPLE, **STDLIB_ONLY}
+    expected = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+    written = json_io.dumps(data)
+    assert written == expected
+
+    loaded = json_io.loads(written)
+    assert loaded["огромное"] == 2**70 + 1
+    assert type(loaded["огромное"]) is int
+    assert math.isnan(loaded["nan"])
+    assert loaded["бесконечности"] == [float("inf"), float("-inf")]
+
+
+def test_wide_integers_are_read_as_int(backend):
+    """orjson читает целые шире 64 бит как float – такие файлы должен читать stdlib."""
+    loaded = json_io.loads(json_io.dumps({"const": 2**70 + 1}))
+
+    assert loaded["const"] == 2**70 + 1
+    assert type(loaded["const"]) is int
+
+
+def test_exponent_floats_round_trip(backend):
+    """Запись экспоненты может отличаться (1e20 и 1e+20), но значение читается то же."""
+    data = {"big": 1e20, "small": 1e-7, "neg": -2.5e-300}
+    assert json_io.loads(json_io.dumps(data)) == data
+
+
+def test_fingerprint_ignores_key_order():
+    a = {"type": "object", "properties": {"x": {"type": "string"}, "y": {"type": "integer"}}}
+    b = {"properties": {"y": {"type": "integer"}, "x": {"type": "string"}}, "type": "object"}
+
+    assert json_io.fingerprint(a) == json_io.fingerprint(b)
+    assert json_io.fingerprint(a) != json_io.fingerprint({"type": "object"})
+
+
+def test_fingerprint_is_stable_within_backend(backend):
+    """В пределах одного бэкенда отпечаток зависит только от значения, а не от объекта."""
+    data = {**SAMPLE, **STDLIB_ONLY, "экспоненты": [1e20, 1e-7]}
+    again = json.loads(json.dumps(data))
+
+    assert json_io.fingerprint(again) == json_io.fingerprint(data)
+
+
+def test_write_file_replaces_target_atomically(tmp_path):
+    target = tmp_path / "snap.schema.json"
+    target.write_text("old", encoding="utf-8")
+
+    json_io.write_file(target, SAMPLE)
+
+    assert json_io.loads(target.read_bytes()) == SAMPLE
+    assert [p.name for p in tmp_path.iterdir()] == ["snap.schema.json"]
+
+
+def test_write_file_keeps_target_on_error(tmp_path):
+    target = tmp_path / "snap.schema.json"
+    target.write_text("old", encoding="utf-8")
+
+    with pytest.raises(TypeError):
+        json_io.write_file(target, {"bad": object()})
+
+    assert target.read_text(encoding="utf-8") == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["snap.schema.json"]
+
+
+def test_write_file_uses_unique_temp_files(tmp_path, monkeypatch):
+    """Параллельные записи одного файла не делят временный файл и не оставляют мусор."""
+    target = tmp_path / "snap.schema.json"
+    sources = []
+
+    def failing_replace(src, dst):
+        sources.append(src)
+        raise OSError("replace failed")
+
+    monkeypatch.setattr(json_io.os, "replace", failing_replace)
+    for _ in range(2):
+        with pytest.raises(OSError):
+            json_io.write_file(target, SAMPLE)
+
+    assert len(set(sources)) == 2
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX permissions")
+def test_write_file_respects_current_umask(tmp_path):
+    """Права файла снимка считаются от umask на момент записи, как у open()."""
+    target = tmp_path / "snap.schema.json"
+    old_umask = os.umask(0o027)
+    try:
+        json_io.write_file(target, SAMPLE)
+    finally:
+        os.umask(old_umask)
+
+    assert stat.S_IMODE(target.stat().st_mode) == 0o640
+
+
+@pytest.mark.parametrize(
+    "obj, expected",
+    [
+        ({"a": [1, 1.5, True, None, ["x"]]}, True),
+        ({"a": ("x",)}, False),
+        ({"a": float("nan")}, False),
+        ({1: "x"}, False),
+        ({"a": object()}, False),
+    ],
+)
+def test_is_plain(obj, expected):
+    """Простыми считаются только данные, типы которых переживают сериализацию."""
+    assert json_io.is_plain(obj) is expected
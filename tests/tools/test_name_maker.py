@@ -1,3 +1,5 @@
+import gc
+import weakref
 from functools import wraps
 
 import pytest
@@ -231,3 +233,61 @@ def test_matrix_basic_suffixes(obj, expected_suffix):
     got = NameMaker.format(obj, rule)
     exp_prefix = _expected_prefix_for_module(obj, use_path_dot=True)
     assert got == f"{exp_prefix}{expected_suffix}"
+
+
+def test_mixed_duplicates_collapsed_in_one_pass():
+    got = NameMaker.format(free_func, "a..//--b__{method}")
+    assert got == "a./-b__free_func"
+
+
+def test_rule_is_parsed_once():
+    NameMaker._compile.cache_clear()
+    rule = "pre-{class_method=/}-{unknown}-post"
+    for obj in (free_func, C().m, C.s):
+        NameMaker.format(obj, rule)
+    assert NameMaker._compile.cache_info().misses == 1
+    assert NameMaker._compile(rule) == (
+        "pre-",
+        ("class_method", "/"),
+        "-",
+        ("unknown", None),
+        "-post",
+    )
+
+
+def test_unhashable_callable_is_supported():
+    class Unhashable:
+        __hash__ = None  # type: ignore[assignment]
+
+        def __call__(self):
+            pass
+
+    assert NameMaker.format(Unhashable(), "{class_method=.}") == "Unhashable.__call__"
+
+
+def test_repeated_format_is_served_from_cache():
+    NameMaker._format_lru.cache_clear()
+    for _ in range(5):
+        assert NameMaker.format(C.m, "{class_method=.}") == "C.m"
+    info = NameMaker._format_lru.cache_info()
+    assert (info.hits, info.misses) == (4, 1)
+
+
+def test_cache_does_not_keep_instances_alive():
+    """Кэш хранит только строки: self связанного метода освобождается после теста."""
+    instance = C()
+    ref = weakref.ref(instance)
+
+    assert NameMaker.format(instance.m, "{class_method=.}") == "C.m"
+    assert NameMaker.format(K(), "{class_method=.}") == "K.__call__"
+    del instance
+    gc.collect()
+
+    assert ref() is None
+
+
+def test_bound_methods_of_new_instances_hit_the_cache():
+    NameMaker._format_lru.cache_clear()
+    for _ in range(3):
+        NameMaker.format(C().m, "{class_method=.}")
+    assert NameMaker._format_lru.cache_info().hits == 2